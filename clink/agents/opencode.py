@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import json
+import re
 from typing import Any
 
 from clink.models import ResolvedCLIClient
@@ -10,6 +11,11 @@ from clink.parsers.base import ParsedCLIResponse
 
 from .base import AgentOutput, BaseCLIAgent
 
+_DECODER = json.JSONDecoder()
+# Error payloads are emitted as whole objects on their own line (JSONL events or a JSON
+# dump after a log prefix); braces further into a line belong to some other value
+_OBJECT_START = re.compile(r"^[ \t]*\{", re.MULTILINE)
+
 
 class OpenCodeAgent(BaseCLIAgent):
     """OpenCode-specific behaviour."""
@@ -28,40 +34,58 @@ class OpenCodeAgent(BaseCLIAgent):
         output_file_content: str | None,
     ) -> AgentOutput | None:
         """Attempt to recover from OpenCode CLI errors."""
-        combined = "\n".join(part for part in (stderr, stdout) if part)
+        if stderr and stdout:
+            combined = stderr + "\n" + stdout
+        else:
+            combined = stderr or stdout
         if not combined:
             return None
 
-        # Try to extract JSON error payload
-        brace_index = combined.find("{")
-        if brace_index == -1:
-            return None
-
-        json_candidate = combined[brace_index:]
-        try:
-            payload: dict[str, Any] = json.loads(json_candidate)
-        except json.JSONDecodeError:
-            return None
-
-        # Extract error information
-        error_block = payload.get("error")
-        if not isinstance(error_block, dict):
-            # Maybe the whole payload is an error
-            if "message" in payload or "error" in payload:
-                error_block = payload
-            else:
+        # Try to extract JSON error payload. Decode in place from each '{' that starts a line,
+        # so braces inside a log line or a truncated event are never taken for a payload and
+        # trailing output after an object is tolerated. Objects without error information
+        # (log lines, JSONL progress events) are stepped over. A nested "error" object wins;
+        # otherwise fall back to the first object that itself looks like an error.
+        payload: dict[str, Any] | None = None
+        prologue_parts: list[str] = []
+        fallback_payload: dict[str, Any] | None = None
+        fallback_prologue_parts: list[str] = []
+        # Plain text seen so far, excluding decoded objects, for the message prologue
+        text_parts: list[str] = []
+        text_start = 0
+        match = _OBJECT_START.search(combined)
+        while match:
+            brace_index = match.end() - 1
+            try:
+                candidate, end_index = _DECODER.raw_decode(combined, brace_index)
+            except json.JSONDecodeError:
+                match = _OBJECT_START.search(combined, brace_index + 1)
+                continue
+            preceding = combined[text_start:brace_index]
+            if isinstance(candidate.get("error"), dict):
+                payload, prologue_parts = candidate, [*text_parts, preceding]
+                break
+            if fallback_payload is None and ("message" in candidate or "error" in candidate):
+                fallback_payload, fallback_prologue_parts = candidate, [*text_parts, preceding]
+            text_parts.append(preceding)
+            text_start = end_index
+            match = _OBJECT_START.search(combined, end_index)
+
+        if payload is None:
+            if fallback_payload is None:
                 return None
+            # The whole payload is the error
+            payload, prologue_parts = fallback_payload, fallback_prologue_parts
+            error_block = payload
+        else:
+            error_block = payload["error"]
 
-        code = error_block.get("code") if isinstance(error_block, dict) else None
-        err_type = error_block.get("type") if isinstance(error_block, dict) else None
-        detail_message = (
-            error_block.get("message")
-            if isinstance(error_block, dict)
-            else str(error_block)
-        )
+        code = error_block.get("code")
+        err_type = error_block.get("type")
+        detail_message = error_block.get("message")
 
         # Build error message
-        prologue = combined[:brace_index].strip()
+        prologue = "\n".join(part.strip() for part in prologue_parts if part.strip())
         lines: list[str] = []
         if prologue and (not detail_message or prologue not in detail_message):
             lines.append(prologue)
@@ -5,72 +5,159 @@ from __future__ import annotations
 import json
 from typing import Any
 
+try:  # orjson is a declared dependency; its decoder is considerably faster on JSONL event streams
+    import orjson
+except ImportError:  # Fall back to the stdlib for environments installed without it
+    orjson = None
+
 from .base import BaseParser, ParsedCLIResponse, ParserError
 
+# json.loads re-checks input type on every call before delegating to a decoder;
+# call a shared decoder directly since the parser only ever passes str
+_stdlib_loads = json.JSONDecoder().decode
+_loads = orjson.loads if orjson is not None else _stdlib_loads
+
+# JSON insignificant whitespace, used to find content bounds without stripping stdout
+_WHITESPACE = " \t\r\n"
+
+# Payload fields that may carry the response text, in priority order
+_CONTENT_KEYS = ("content", "result", "message", "response", "text", "output")
+
+# step_finish fields copied into metadata as (payload key, metadata key, required type or None)
+_META_FIELDS: tuple[tuple[str, str, type | None], ...] = (
+    ("model", "model_used", None),
+    ("usage", "usage", dict),
+    ("thinking", "thinking", None),
+    ("duration", "duration_ms", None),
+    ("session_id", "session_id", None),
+)
+_MISSING = object()
+
+
+def _loads_lenient(value: str) -> Any:
+    """Decode JSON, retrying input that orjson rejects with the stdlib decoder.
+
+    orjson refuses escaped lone surrogates (emitted by JavaScript's JSON.stringify for split
+    surrogate pairs) and NaN/Infinity, all of which the stdlib accepts. orjson also decodes
+    integers wider than 64 bits as floats; that difference does not raise and is not retried.
+    """
+    try:
+        return _loads(value)
+    except ValueError:
+        if _loads is _stdlib_loads:
+            raise
+        return _stdlib_loads(value)
+
 
 class OpenCodeJSONParser(BaseParser):
     """Parse stdout produced by OpenCode CLI with JSON output."""
 
     name = "opencode_json"
 
+    def __init__(self, *, keep_raw_events: bool = False) -> None:
+        # Retaining every decoded event keeps large JSONL replies alive for the caller's lifetime;
+        # enable only when the raw stream is needed for debugging.
+        self.keep_raw_events = keep_raw_events
+
     def parse(self, stdout: str, stderr: str) -> ParsedCLIResponse:
-        if not stdout.strip():
+        # Locate the first and last non-whitespace characters instead of stripping a copy of
+        # what may be a multi-megabyte stdout
+        length = len(stdout)
+        start = 0
+        while start < length and stdout[start] in _WHITESPACE:
+            start += 1
+        if start == length:
             raise ParserError("OpenCode CLI returned empty stdout while JSON output was expected")
+        last = length - 1
+        while stdout[last] in _WHITESPACE:
+            last -= 1
 
-        # OpenCode outputs JSONL (one JSON object per line) - parse each line
-        lines = stdout.strip().split("\n")
         events: list[dict[str, Any]] = []
-
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
+        # Result of decoding stdout as one JSON document; attempted at most once
+        document: Any = _MISSING
+        document_error: ValueError | None = None
+        first = stdout[start]
+        if first == "[" or (first == "{" and stdout.find("\n", start, last) == -1):
+            # JSON array of events or single-line JSON object: decode the whole document
+            # directly and skip the JSONL scan. Both decoders ignore the surrounding whitespace.
             try:
-                event = json.loads(line)
-                if isinstance(event, dict):
-                    events.append(event)
-            except json.JSONDecodeError:
-                # Skip non-JSON lines
-                continue
+                document = _loads_lenient(stdout)
+            except ValueError as exc:
+                document_error = exc
+                if first == "[":
+                    # Not a JSON array after all; the lines may still be JSONL
+                    events = self._decode_jsonl(stdout)
+        else:
+            # OpenCode outputs JSONL (one JSON object per line)
+            events = self._decode_jsonl(stdout)
 
         if not events:
-            # Fallback: try parsing entire stdout as single JSON
-            try:
-                loaded = json.loads(stdout)
-                if isinstance(loaded, dict):
-                    events = [loaded]
-                elif isinstance(loaded, list):
-                    events = [e for e in loaded if isinstance(e, dict)]
-            except json.JSONDecodeError as exc:
-                raise ParserError(f"Failed to decode OpenCode CLI JSON output: {exc}") from exc
+            # Fallback: treat the entire stdout as a single JSON document, decoding it only if
+            # that was not already attempted above
+            if document is _MISSING and document_error is None:
+                try:
+                    document = _loads_lenient(stdout)
+                except ValueError as exc:
+                    document_error = exc
+            if document_error is not None:
+                raise ParserError(f"Failed to decode OpenCode CLI JSON output: {document_error}") from document_error
+            if isinstance(document, dict):
+                events = [document]
+            elif isinstance(document, list):
+                events = [e for e in document if isinstance(e, dict)]
 
-        metadata: dict[str, Any] = {"events": events}
+        metadata: dict[str, Any] = {}
+        if self.keep_raw_events:
+            metadata["events"] = events
 
-        # Extract content from JSONL events
+        # The final response is the last "text" event that still has text once any <SUMMARY>
+        # block is removed, so search from the end; text events win over generic content
+        # fields. Scanning backwards also tracks the step_finish closing that step: the
+        # nearest one after the chosen text event.
         content: str = ""
-
-        # Look for "text" type events which contain the actual response
-        for event in events:
+        step_finish: dict[str, Any] | None = None
+        index = len(events)
+        while index:
+            index -= 1
+            event = events[index]
             event_type = event.get("type")
-            if event_type == "text":
+            if event_type == "step_finish":
+                step_finish = event
+            elif event_type == "text":
                 # Extract text from part.text
                 part = event.get("part", {})
                 text = part.get("text", "")
+                if not text:
+                    continue
+                # Remove <SUMMARY> blocks if present; a summary-only part is not the response
+                head, sep, _ = text.partition("<SUMMARY>")
+                if sep:
+                    text = head.rstrip()
                 if text:
-                    # Remove <SUMMARY> blocks if present
-                    if "<SUMMARY>" in text:
-                        text = text.split("<SUMMARY>")[0].strip()
                     content = text
                     break
-            elif not content:
+
+        if content:
+            if step_finish is None:
+                # Stream ended without closing the final step; use the latest earlier step_finish
+                while index:
+                    index -= 1
+                    if events[index].get("type") == "step_finish":
+                        step_finish = events[index]
+                        break
+        else:
+            # No usable text event: fall back to generic content. The backwards scan has
+            # left step_finish at the first one in the stream.
+            for event in events:
+                if event.get("type") == "text":
+                    continue
                 # Fallback to generic content extraction
                 content = self._extract_content(event)
+                if content:
+                    break
 
-        # Build metadata from step_finish event if present
-        for event in events:
-            if event.get("type") == "step_finish":
-                metadata.update(self._build_metadata(event))
-                break
+        if step_finish is not None:
+            metadata.update(self._build_metadata(step_finish))
 
         stderr_text = stderr.strip()
         if stderr_text:
@@ -88,37 +175,82 @@ class OpenCodeJSONParser(BaseParser):
 
         raise ParserError("OpenCode CLI response did not contain a textual result")
 
+    def _decode_jsonl(self, stdout: str) -> list[dict[str, Any]]:
+        """Decode JSONL output, keeping only JSON object lines."""
+        loads = _loads
+
+        # Only lines holding a JSON object matter. Lines that do not start with '{' are
+        # stripped once in case they are padded, and dropped otherwise, so progress output
+        # and other non-JSON text never reaches the decoder.
+        lines: list[str] = []
+        add = lines.append
+        for line in stdout.split("\n"):
+            if line[:1] != "{":
+                line = line.strip()
+                if line[:1] != "{":
+                    continue
+            add(line)
+
+        # Optimistic path: every remaining line is normally a complete object, so decode them
+        # through map() and let the per-line iteration run in C
+        try:
+            decoded = list(map(loads, lines))
+        except ValueError:
+            # A malformed object line (e.g. output truncated when the CLI was killed) or one the
+            # fast decoder rejects: decode line by line, retrying failures stripped with the
+            # stdlib decoder (see _loads_lenient) and skipping whatever still does not parse
+            decoded = []
+            append = decoded.append
+            for line in lines:
+                try:
+                    append(loads(line))
+                except ValueError:
+                    try:
+                        append(_stdlib_loads(line.strip()))
+                    except ValueError:
+                        continue
+
+        # Decoders return concrete dicts, so an exact type check suffices
+        return [event for event in decoded if type(event) is dict]
+
     def _extract_content(self, payload: dict[str, Any]) -> str:
         """Extract textual content from OpenCode response."""
-        # Try various common response fields
-        for key in ("content", "result", "message", "response", "text", "output"):
-            value = payload.get(key)
-            if isinstance(value, str) and value.strip():
-                return value.strip()
-            if isinstance(value, list):
-                # Join list of strings
-                joined = [part.strip() for part in value if isinstance(part, str) and part.strip()]
-                if joined:
-                    return "\n".join(joined)
-
-        # Check for nested content in 'data' field
-        data = payload.get("data")
-        if isinstance(data, dict):
-            return self._extract_content(data)
-
-        return ""
+        # Walk nested 'data' payloads iteratively rather than recursing per level
+        while True:
+            # Try various common response fields
+            for key in _CONTENT_KEYS:
+                value = payload.get(key)
+                if isinstance(value, str):
+                    stripped = value.strip()
+                    if stripped:
+                        return stripped
+                elif isinstance(value, list):
+                    # Join list of strings
+                    parts = (part.strip() for part in value if isinstance(part, str))
+                    joined = "\n".join(part for part in parts if part)
+                    if joined:
+                        return joined
+
+            # Check for nested content in 'data' field
+            data = payload.get("data")
+            if not isinstance(data, dict):
+                return ""
+            payload = data
 
     def _build_metadata(self, payload: dict[str, Any]) -> dict[str, Any]:
         """Extract metadata from OpenCode response."""
         metadata: dict[str, Any] = {}
 
         # Common metadata fields
-        if "model" in payload:
-            metadata["model_used"] = payload["model"]
-        if "usage" in payload and isinstance(payload["usage"], dict):
-            metadata["usage"] = payload["usage"]
-        if "thinking" in payload:
-            metadata["thinking"] = payload["thinking"]
+        get = payload.get
+        for source_key, target_key, required_type in _META_FIELDS:
+            value = get(source_key, _MISSING)
+            if value is _MISSING:
+                continue
+            if required_type is not None and not isinstance(value, required_type):
+                continue
+            metadata[target_key] = value
+
         if "error" in payload:
             metadata["is_error"] = True
             error = payload["error"]
@@ -126,9 +258,5 @@ class OpenCodeJSONParser(BaseParser):
                 metadata["error_message"] = error.get("message", str(error))
             else:
                 metadata["error_message"] = str(error)
-        if "duration" in payload:
-            metadata["duration_ms"] = payload["duration"]
-        if "session_id" in payload:
-            metadata["session_id"] = payload["session_id"]
 
         return metadata
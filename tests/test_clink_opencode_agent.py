@@ -0,0 +1,174 @@
+import asyncio
+import shutil
+from pathlib import Path
+
+import pytest
+
+from clink.agents.base import CLIAgentError
+from clink.agents.opencode import OpenCodeAgent
+from clink.models import ResolvedCLIClient, ResolvedCLIRole
+
+
+class DummyProcess:
+    def __init__(self, *, stdout: bytes = b"", stderr: bytes = b"", returncode: int = 0):
+        self._stdout = stdout
+        self._stderr = stderr
+        self.returncode = returncode
+
+    async def communicate(self, _input):
+        return self._stdout, self._stderr
+
+
+@pytest.fixture()
+def opencode_agent():
+    prompt_path = Path("systemprompts/clink/default.txt").resolve()
+    role = ResolvedCLIRole(name="default", prompt_path=prompt_path, role_args=[])
+    client = ResolvedCLIClient(
+        name="opencode",
+        executable=["opencode-stdin"],
+        internal_args=[],
+        config_args=[],
+        env={},
+        timeout_seconds=30,
+        parser="opencode_json",
+        roles={"default": role},
+        output_to_file=None,
+        working_dir=None,
+    )
+    return OpenCodeAgent(client), role
+
+
+async def _run_agent_with_process(monkeypatch, agent, role, process):
+    async def fake_create_subprocess_exec(*_args, **_kwargs):
+        return process
+
+    def fake_which(executable_name):
+        return f"/usr/bin/{executable_name}"
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_create_subprocess_exec)
+    monkeypatch.setattr(shutil, "which", fake_which)
+    return await agent.run(role=role, prompt="do something", files=[], images=[])
+
+
+@pytest.mark.asyncio
+async def test_opencode_agent_recovers_nested_error(monkeypatch, opencode_agent):
+    agent, role = opencode_agent
+    error_json = '{"error": {"type": "ProviderAuthError", "message": "Missing API key", "code": "auth_missing"}}'
+    stderr = ("Error: provider rejected request\n" + error_json).encode()
+    process = DummyProcess(stderr=stderr, returncode=1)
+
+    result = await _run_agent_with_process(monkeypatch, agent, role, process)
+
+    assert result.returncode == 1
+    assert result.parsed.metadata["cli_error_recovered"] is True
+    assert result.parsed.metadata["cli_error_code"] == "auth_missing"
+    assert "OpenCode CLI reported an error (auth_missing)" in result.parsed.content
+    assert "Missing API key" in result.parsed.content
+
+
+@pytest.mark.asyncio
+async def test_opencode_agent_recovers_top_level_error(monkeypatch, opencode_agent):
+    agent, role = opencode_agent
+    stdout = b'{"type": "RateLimited", "message": "Too many requests"}'
+    process = DummyProcess(stdout=stdout, returncode=1)
+
+    result = await _run_agent_with_process(monkeypatch, agent, role, process)
+
+    assert result.parsed.metadata["cli_error_type"] == "RateLimited"
+    assert "Too many requests" in result.parsed.content
+
+
+@pytest.mark.asyncio
+async def test_opencode_agent_propagates_unrecoverable_error(monkeypatch, opencode_agent):
+    agent, role = opencode_agent
+    process = DummyProcess(stderr=b"Plain failure without structured payload", returncode=1)
+
+    with pytest.raises(CLIAgentError):
+        await _run_agent_with_process(monkeypatch, agent, role, process)
+
+
+@pytest.mark.asyncio
+async def test_opencode_agent_skips_braces_in_log_prefix(monkeypatch, opencode_agent):
+    agent, role = opencode_agent
+    stderr = b'[opencode] retrying {attempt 2}\n{"error": {"code": "timeout", "message": "Request timed out"}}\n'
+    stdout = b"trailing noise"
+    process = DummyProcess(stdout=stdout, stderr=stderr, returncode=1)
+
+    result = await _run_agent_with_process(monkeypatch, agent, role, process)
+
+    assert result.parsed.metadata["cli_error_code"] == "timeout"
+    assert "[opencode] retrying {attempt 2}" in result.parsed.content
+    assert "Request timed out" in result.parsed.content
+
+
+@pytest.mark.asyncio
+async def test_opencode_agent_skips_log_objects_before_error(monkeypatch, opencode_agent):
+    agent, role = opencode_agent
+    stderr = (
+        b'{"level":"info","message":"Loading config"}\n'
+        b'{"error": {"code": "auth_missing", "message": "Missing API key"}}\n'
+    )
+    process = DummyProcess(stderr=stderr, returncode=1)
+
+    result = await _run_agent_with_process(monkeypatch, agent, role, process)
+
+    assert result.parsed.metadata["cli_error_code"] == "auth_missing"
+    assert "Missing API key" in result.parsed.content
+    assert "Loading config" not in result.parsed.content
+
+
+@pytest.mark.asyncio
+async def test_opencode_agent_finds_error_event_in_jsonl_stdout(monkeypatch, opencode_agent):
+    agent, role = opencode_agent
+    stdout = (
+        b'{"type":"step_start","part":{"type":"step-start"}}\n'
+        b'{"type":"error","error":{"type":"ProviderModelNotFoundError","message":"Unknown model"}}\n'
+    )
+    process = DummyProcess(stdout=stdout, returncode=1)
+
+    result = await _run_agent_with_process(monkeypatch, agent, role, process)
+
+    assert result.parsed.metadata["cli_error_type"] == "ProviderModelNotFoundError"
+    assert "Unknown model" in result.parsed.content
+    assert "step_start" not in result.parsed.content
+
+
+@pytest.mark.asyncio
+async def test_opencode_agent_propagates_error_without_error_payload(monkeypatch, opencode_agent):
+    agent, role = opencode_agent
+    stderr = b'{"level":"info","step":"boot"}\nprocess exited unexpectedly\n'
+    process = DummyProcess(stderr=stderr, returncode=1)
+
+    with pytest.raises(CLIAgentError):
+        await _run_agent_with_process(monkeypatch, agent, role, process)
+
+
+@pytest.mark.asyncio
+async def test_opencode_agent_keeps_plain_text_prologue_between_events(monkeypatch, opencode_agent):
+    agent, role = opencode_agent
+    stdout = (
+        b'{"type":"tool_use","part":{"tool":"read","output":"a"}}\n'
+        b"Provider request failed\n"
+        b'{"type":"tool_use","part":{"tool":"read","output":"b"}}\n'
+        b'{"type":"error","error":{"type":"ProviderModelNotFoundError","message":"Unknown model"}}\n'
+    )
+    process = DummyProcess(stdout=stdout, returncode=1)
+
+    result = await _run_agent_with_process(monkeypatch, agent, role, process)
+
+    assert result.parsed.content == (
+        "OpenCode CLI reported an error (ProviderModelNotFoundError).\nProvider request failed\nUnknown model"
+    )
+
+
+@pytest.mark.asyncio
+async def test_opencode_agent_ignores_nested_objects_in_truncated_output(monkeypatch, opencode_agent):
+    agent, role = opencode_agent
+    stdout = (
+        b'{"type":"step_start"}\n'
+        b'{"type":"tool_use","part":{"tool":"bash","input":{"message":"fix typo"},"output":"ok"\n'
+    )
+    process = DummyProcess(stdout=stdout, stderr=b"Killed", returncode=137)
+
+    with pytest.raises(CLIAgentError):
+        await _run_agent_with_process(monkeypatch, agent, role, process)
@@ -0,0 +1,297 @@
+"""Tests for the OpenCode CLI JSON parser."""
+
+import pytest
+
+from clink.parsers.opencode import OpenCodeJSONParser, ParserError
+
+
+def _build_jsonl_stdout() -> str:
+    return (
+        '{"type":"step_start","part":{"type":"step-start"}}\n'
+        "not json at all\n"
+        '{"type":"text","part":{"type":"text","text":"Hello from OpenCode"}}\n'
+        '{"type":"step_finish","model":"opencode/test","usage":{"input":10,"output":5},"session_id":"ses_1"}\n'
+    )
+
+
+def test_opencode_parser_extracts_text_and_metadata():
+    parser = OpenCodeJSONParser()
+
+    parsed = parser.parse(_build_jsonl_stdout(), stderr="")
+
+    assert parsed.content == "Hello from OpenCode"
+    assert parsed.metadata["model_used"] == "opencode/test"
+    assert parsed.metadata["usage"] == {"input": 10, "output": 5}
+    assert parsed.metadata["session_id"] == "ses_1"
+
+
+def test_opencode_parser_falls_back_to_single_json_document():
+    parser = OpenCodeJSONParser()
+    stdout = '{\n  "result": "  Done  ",\n  "model": "opencode/test"\n}'
+
+    parsed = parser.parse(stdout, stderr="")
+
+    assert parsed.content == "Done"
+
+
+def test_opencode_parser_rejects_non_json_output():
+    parser = OpenCodeJSONParser()
+
+    with pytest.raises(ParserError):
+        parser.parse("plain text output", stderr="")
+
+
+def test_opencode_parser_rejects_empty_stdout():
+    parser = OpenCodeJSONParser()
+
+    with pytest.raises(ParserError):
+        parser.parse("   \n", stderr="")
+
+
+def test_opencode_parser_works_with_stdlib_json(monkeypatch):
+    import json
+
+    import clink.parsers.opencode as opencode_module
+
+    monkeypatch.setattr(opencode_module, "_loads", json.JSONDecoder().decode)
+    parser = OpenCodeJSONParser()
+
+    parsed = parser.parse(_build_jsonl_stdout(), stderr="")
+
+    assert parsed.content == "Hello from OpenCode"
+    assert parsed.metadata["model_used"] == "opencode/test"
+
+
+def test_opencode_parser_accepts_json_the_fast_decoder_rejects():
+    parser = OpenCodeJSONParser()
+    stdout = (
+        '{"type":"text","part":{"text":"Earlier step"}}\n'
+        '{"type":"text","part":{"text":"Split pair \\ud83d here"}}\n'
+        '{"type":"step_finish","model":"opencode/test","thinking":NaN}\n'
+    )
+
+    parsed = parser.parse(stdout, stderr="")
+
+    assert parsed.content == "Split pair \ud83d here"
+    assert parsed.metadata["model_used"] == "opencode/test"
+
+
+def test_opencode_parser_accepts_single_object_the_fast_decoder_rejects():
+    parser = OpenCodeJSONParser()
+
+    parsed = parser.parse('{"result":"Lone \\udc00 surrogate"}', stderr="")
+
+    assert parsed.content == "Lone \udc00 surrogate"
+
+
+def test_opencode_parser_prefers_text_event_over_generic_content():
+    parser = OpenCodeJSONParser()
+    stdout = (
+        '{"type":"status","message":"thinking..."}\n'
+        '{"type":"step_finish","model":"opencode/test","duration":1200}\n'
+        '{"type":"text","part":{"text":"Final answer"}}\n'
+    )
+
+    parsed = parser.parse(stdout, stderr="")
+
+    assert parsed.content == "Final answer"
+    assert parsed.metadata["duration_ms"] == 1200
+
+
+def test_opencode_parser_handles_single_line_json_object():
+    parser = OpenCodeJSONParser()
+    stdout = '  {"type":"step_finish","result":"Single object reply","model":"opencode/test"}\n'
+
+    parsed = parser.parse(stdout, stderr="")
+
+    assert parsed.content == "Single object reply"
+    assert parsed.metadata["model_used"] == "opencode/test"
+
+
+def test_opencode_parser_only_keeps_raw_events_when_enabled():
+    parsed = OpenCodeJSONParser().parse(_build_jsonl_stdout(), stderr="")
+    assert "events" not in parsed.metadata
+
+    parsed = OpenCodeJSONParser(keep_raw_events=True).parse(_build_jsonl_stdout(), stderr="")
+    assert [event["type"] for event in parsed.metadata["events"]] == ["step_start", "text", "step_finish"]
+
+
+def test_opencode_parser_strips_summary_block():
+    parser = OpenCodeJSONParser()
+    stdout = '{"type":"text","part":{"text":"Answer body\\n\\n<SUMMARY>short</SUMMARY>"}}\n'
+
+    parsed = parser.parse(stdout, stderr="")
+
+    assert parsed.content == "Answer body"
+
+
+def test_opencode_parser_joins_list_content():
+    parser = OpenCodeJSONParser()
+    stdout = '{"output": ["  first  ", "", 3, "second"]}'
+
+    parsed = parser.parse(stdout, stderr="")
+
+    assert parsed.content == "first\nsecond"
+
+
+def test_opencode_parser_reads_deeply_nested_data_content():
+    parser = OpenCodeJSONParser()
+    depth = 200
+    stdout = '{"data":' * depth + '{"result":"deep"}' + "}" * depth
+
+    parsed = parser.parse(stdout, stderr="")
+
+    assert parsed.content == "deep"
+
+
+def test_opencode_parser_builds_step_finish_metadata():
+    parser = OpenCodeJSONParser()
+    stdout = (
+        '{"type":"text","part":{"text":"Partial"}}\n'
+        '{"type":"step_finish","model":null,"usage":"n/a","thinking":false,"error":{"message":"boom"}}\n'
+    )
+
+    parsed = parser.parse(stdout, stderr="")
+
+    assert parsed.metadata["model_used"] is None
+    assert "usage" not in parsed.metadata
+    assert parsed.metadata["thinking"] is False
+    assert parsed.metadata["is_error"] is True
+    assert parsed.metadata["error_message"] == "boom"
+
+
+def test_opencode_parser_uses_last_text_event_as_final_response():
+    parser = OpenCodeJSONParser()
+    stdout = (
+        '{"type":"text","part":{"text":"Let me check the files."}}\n'
+        '{"type":"step_finish","model":"opencode/test"}\n'
+        '{"type":"tool_use","part":{"tool":"read"}}\n'
+        '{"type":"text","part":{"text":"Here is the final answer."}}\n'
+        '{"type":"text","part":{"text":""}}\n'
+        '{"type":"step_finish","model":"opencode/other"}\n'
+    )
+
+    parsed = parser.parse(stdout, stderr="")
+
+    assert parsed.content == "Here is the final answer."
+    assert parsed.metadata["model_used"] == "opencode/other"
+
+
+def test_opencode_parser_accepts_json_array_of_events():
+    parser = OpenCodeJSONParser()
+    stdout = (
+        '[{"type":"text","part":{"text":"From array"}},\n "ignored",\n {"type":"step_finish","model":"opencode/test"}]'
+    )
+
+    parsed = parser.parse(stdout, stderr="")
+
+    assert parsed.content == "From array"
+    assert parsed.metadata["model_used"] == "opencode/test"
+
+
+def test_opencode_parser_skips_non_object_json_lines():
+    parser = OpenCodeJSONParser()
+    stdout = '\n  \n"status line"\n42\n{"type":"text","part":{"text":"Only object"}}\n'
+
+    parsed = parser.parse(stdout, stderr="")
+
+    assert parsed.content == "Only object"
+
+
+def test_opencode_parser_skips_summary_only_final_text_part():
+    parser = OpenCodeJSONParser()
+    stdout = (
+        '{"type":"text","part":{"text":"The answer is 4."}}\n'
+        '{"type":"text","part":{"text":"<SUMMARY>4</SUMMARY>"}}\n'
+        '{"type":"step_finish","model":"opencode/test"}\n'
+    )
+
+    parsed = parser.parse(stdout, stderr="")
+
+    assert parsed.content == "The answer is 4."
+    assert parsed.metadata["model_used"] == "opencode/test"
+
+
+def test_opencode_parser_uses_earlier_step_finish_when_final_step_is_unclosed():
+    parser = OpenCodeJSONParser()
+    stdout = (
+        '{"type":"step_finish","model":"opencode/first"}\n'
+        '{"type":"text","part":{"text":"Step one"}}\n'
+        '{"type":"step_finish","model":"opencode/second"}\n'
+        '{"type":"text","part":{"text":"Step two"}}\n'
+    )
+
+    parsed = parser.parse(stdout, stderr="")
+
+    assert parsed.content == "Step two"
+    assert parsed.metadata["model_used"] == "opencode/second"
+
+
+def test_opencode_parser_never_decodes_non_json_lines(monkeypatch):
+    import clink.parsers.opencode as opencode_module
+
+    calls: list[str] = []
+    real_loads = opencode_module._loads
+
+    def counting_loads(value):
+        calls.append(value)
+        return real_loads(value)
+
+    monkeypatch.setattr(opencode_module, "_loads", counting_loads)
+    parser = OpenCodeJSONParser()
+
+    parsed = parser.parse(_build_jsonl_stdout(), stderr="")
+
+    assert parsed.content == "Hello from OpenCode"
+    assert "not json at all" not in calls
+    assert len(calls) == 3
+
+
+def test_opencode_parser_tolerates_non_json_whitespace_around_lines():
+    parser = OpenCodeJSONParser()
+    stdout = '\u00a0{"type":"text","part":{"text":"Padded"}}\u00a0\nprogress: done\n'
+
+    parsed = parser.parse(stdout, stderr="")
+
+    assert parsed.content == "Padded"
+
+
+def test_opencode_parser_skips_truncated_final_line():
+    parser = OpenCodeJSONParser()
+    stdout = (
+        '{"type":"text","part":{"text":"Before the crash"}}\n'
+        '{"type":"step_finish","model":"opencode/test"}\n'
+        '{"type":"tool_use","part":{"tool":"bash","input":{"command":"ls"'
+    )
+
+    parsed = parser.parse(stdout, stderr="")
+
+    assert parsed.content == "Before the crash"
+    assert parsed.metadata["model_used"] == "opencode/test"
+
+
+@pytest.mark.parametrize(
+    "stdout",
+    [
+        '["status", 1]',
+        '[{"type":"text","part":{"text":"cut off"}},\n{"type":"step_fin',
+        '{"type":"text","part":{"text":"cut off"',
+    ],
+)
+def test_opencode_parser_decodes_whole_document_only_once(monkeypatch, stdout):
+    import clink.parsers.opencode as opencode_module
+
+    calls: list[str] = []
+    real_loads = opencode_module._loads
+
+    def counting_loads(value):
+        calls.append(value)
+        return real_loads(value)
+
+    monkeypatch.setattr(opencode_module, "_loads", counting_loads)
+    parser = OpenCodeJSONParser()
+
+    with pytest.raises(ParserError):
+        parser.parse(stdout, stderr="")
+
+    assert calls.count(stdout) == 1